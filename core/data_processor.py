@@ -1,12 +1,137 @@
-import json
 import logging
+import sys
+from typing import Any, List
+import msgspec
 from utils.logger import setup_logger
 
 logger = setup_logger('data_processor')
 
+# Interned event names, used as dispatch keys and for comparisons
+_TICK = sys.intern("tick")
+_CANDLES = sys.intern("candles")
+_ASSETS = sys.intern("assets")
+_BALANCE = sys.intern("balance")
+_COUNTERS = sys.intern("counters/all/success")
+_AUTH_SUCCESS = sys.intern("auth/success")
+
+# Schemas only require what the old dict checks required (an object, plus 'asset'
+# where it was checked); field values stay untyped so the wire types pass through
+class Tick(msgspec.Struct):
+    """PocketOption tick payload"""
+    asset: Any
+    price: Any = None
+    ts: Any = None  # PocketOption uses 'ts' for timestamp
+    bid: Any = None
+    ask: Any = None
+    spread: Any = None
+
+class Candles(msgspec.Struct):
+    """PocketOption candles payload"""
+    asset: Any
+    period: Any = None
+    candles: Any = msgspec.field(default_factory=list)
+    from_: Any = msgspec.field(default=None, name='from')
+    to: Any = None
+
+class Balance(msgspec.Struct):
+    """PocketOption balance payload"""
+    currency: Any = 'NGN'
+    balance: Any = 0
+
+class Counters(msgspec.Struct):
+    """PocketOption counters payload"""
+    pending_withdrawal: Any = msgspec.field(default=0, name='pending-withdrawal')
+    achievements: Any = 0
+    support: Any = 0
+
+# Socket.IO envelope: the event name is decoded first, the payload is left raw
+# and only decoded once we know which schema it belongs to
+ENVELOPE_DECODER = msgspec.json.Decoder(List[msgspec.Raw])
+EVENT_DECODER = msgspec.json.Decoder(str)
+ANY_DECODER = msgspec.json.Decoder()
+EMPTY_PAYLOAD = b'{}'
+
+TICK_POOL_SIZE = 1024  # Recycled TickMsg objects kept for reuse
+
+# Processed messages handed to the strategy engine. Slotted classes instead of
+# dicts: no per-instance __dict__, and fields are plain attribute reads.
+class TickMsg:
+    __slots__ = ('asset', 'price', 'timestamp', 'bid', 'ask', 'spread', 'raw_data')
+    type = _TICK
+    
+    def __init__(self, asset, price, timestamp, bid, ask, spread=None, raw_data=None):
+        self.asset = asset
+        self.price = price
+        self.timestamp = timestamp
+        self.bid = bid
+        self.ask = ask
+        self.spread = spread
+        self.raw_data = raw_data
+
+class CandlesMsg:
+    __slots__ = ('asset', 'timeframe', 'candles', 'from_', 'to', 'raw_data')
+    type = _CANDLES
+    
+    def __init__(self, asset, timeframe, candles, from_=None, to=None, raw_data=None):
+        self.asset = asset
+        self.timeframe = timeframe
+        self.candles = candles
+        self.from_ = from_
+        self.to = to
+        self.raw_data = raw_data
+
+class AssetsMsg:
+    __slots__ = ('assets', 'count', 'raw_data')
+    type = 'assets_list'
+    
+    def __init__(self, assets, raw_data=None):
+        self.assets = assets
+        self.count = len(assets)
+        self.raw_data = raw_data
+
+class BalanceMsg:
+    __slots__ = ('currency', 'balance')
+    type = _BALANCE
+    
+    def __init__(self, currency, balance):
+        self.currency = currency
+        self.balance = balance
+
+class CountersMsg:
+    __slots__ = ('pending_withdrawal', 'achievements', 'support_tickets', 'raw_data')
+    type = 'counters'
+    
+    def __init__(self, pending_withdrawal, achievements, support_tickets, raw_data=None):
+        self.pending_withdrawal = pending_withdrawal
+        self.achievements = achievements
+        self.support_tickets = support_tickets
+        self.raw_data = raw_data
+
+class ControlMsg:
+    """Auth and ping frames"""
+    __slots__ = ('type', 'action', 'raw_data')
+    
+    def __init__(self, type, action=None, raw_data=None):
+        self.type = type
+        self.action = action
+        self.raw_data = raw_data
+
 class DataProcessor:
     def __init__(self):
         self.message_buffer = []
+        self.include_raw = False  # Attach the decoded payload as raw_data (debugging only)
+        
+        # Free list of TickMsg objects; the strategy engine recycles them after use
+        self._tick_pool = [TickMsg('', 0.0, 0, 0.0, 0.0) for _ in range(TICK_POOL_SIZE)]
+        
+        # Message type -> (payload decoder, handler), so dispatch is a single dict lookup per frame
+        self._handlers = {
+            _TICK: (msgspec.json.Decoder(Tick), self._process_tick_data),
+            _CANDLES: (msgspec.json.Decoder(Candles), self._process_candles_data),
+            _ASSETS: (ANY_DECODER, self._process_assets_data),
+            _BALANCE: (msgspec.json.Decoder(Balance), self._process_balance_data),
+            _COUNTERS: (msgspec.json.Decoder(Counters), self._process_counters_data),
+        }
         
     def process_message(self, message):
         """
@@ -14,53 +139,50 @@ class DataProcessor:
         Returns: Processed data or None if not relevant
         """
         try:
-            if isinstance(message, bytes):
-                message = message.decode('utf-8')
-            
             # Log the message for debugging
-            logger.debug(f"Processing message: {message[:100]}...")
+            logger.debug("Processing message: %.100s...", message)
+            
+            # msgspec decodes UTF-8 bytes directly, so only decode for the control frames
+            is_bytes = isinstance(message, bytes)
             
             # Handle different message types based on PocketOption protocol
-            if message.startswith('42['):
+            if message.startswith(b'42[' if is_bytes else '42['):
                 # This is a data message
                 try:
-                    json_data = json.loads(message[2:])
-                    if isinstance(json_data, list) and len(json_data) > 0:
-                        message_type = json_data[0]
+                    parts = ENVELOPE_DECODER.decode(message[2:])
+                    if parts:
+                        message_type = EVENT_DECODER.decode(parts[0])
+                        payload = parts[1] if len(parts) > 1 else EMPTY_PAYLOAD
                         
-                        if message_type == "tick":
-                            tick_data = json_data[1] if len(json_data) > 1 else {}
-                            return self._process_tick_data(tick_data)
-                            
-                        elif message_type == "candles":
-                            candles_data = json_data[1] if len(json_data) > 1 else {}
-                            return self._process_candles_data(candles_data)
-                            
-                        elif message_type == "assets":
-                            assets_data = json_data[1] if len(json_data) > 1 else {}
-                            return self._process_assets_data(assets_data)
-                            
-                        elif message_type == "balance":
-                            balance_data = json_data[1] if len(json_data) > 1 else {}
-                            return self._process_balance_data(balance_data)
-                            
-                        elif message_type == "auth/success":
-                            return {'type': 'auth_success', 'raw_data': json_data}
-                            
-                        elif message_type == "counters/all/success":
-                            counters_data = json_data[1] if len(json_data) > 1 else {}
-                            return self._process_counters_data(counters_data)
+                        entry = self._handlers.get(message_type)
+                        if entry:
+                            decoder, handler = entry
+                            try:
+                                return handler(decoder.decode(payload))
+                            except msgspec.ValidationError as e:
+                                # Payload doesn't match the schema (e.g. a tick without an asset)
+                                logger.debug("Schema mismatch for %s: %s", message_type, e)
+                                return None
+                        
+                        if message_type == _AUTH_SUCCESS:
+                            raw_data = ANY_DECODER.decode(message[2:]) if self.include_raw else None
+                            return ControlMsg('auth_success', raw_data=raw_data)
                 
-                except json.JSONDecodeError:
+                except msgspec.DecodeError:
                     logger.warning(f"Failed to parse JSON message: {message}")
                     return None
+                
+                return None
+            
+            if is_bytes:
+                message = message.decode('utf-8')
             
             # Handle ping messages
-            elif message == '2':  # Ping from server
-                return {'type': 'ping', 'action': 'respond'}
+            if message == '2':  # Ping from server
+                return ControlMsg('ping', 'respond')
                 
             elif message == '42["ping-server"]':  # PocketOption specific ping
-                return {'type': 'ping_server', 'action': 'respond'}
+                return ControlMsg('ping_server', 'respond')
             
             return None
             
@@ -68,90 +190,69 @@ class DataProcessor:
             logger.error(f"Error processing message: {e}")
             return None
     
-    def _process_tick_data(self, tick_data):
+    def _process_tick_data(self, tick):
         """Process tick data messages for PocketOption"""
-        if isinstance(tick_data, dict) and 'asset' in tick_data:
-            return {
-                'type': 'tick',
-                'asset': tick_data['asset'],
-                'price': tick_data.get('price'),
-                'timestamp': tick_data.get('ts'),  # PocketOption uses 'ts' for timestamp
-                'bid': tick_data.get('bid'),
-                'ask': tick_data.get('ask'),
-                'spread': tick_data.get('spread'),
-                'raw_data': tick_data
-            }
-        return None
+        if not self._tick_pool:
+            return TickMsg(tick.asset, tick.price, tick.ts, tick.bid, tick.ask, tick.spread,
+                           tick if self.include_raw else None)
+        
+        msg = self._tick_pool.pop()
+        msg.asset = tick.asset
+        msg.price = tick.price
+        msg.timestamp = tick.ts
+        msg.bid = tick.bid
+        msg.ask = tick.ask
+        msg.spread = tick.spread
+        msg.raw_data = tick if self.include_raw else None
+        return msg
     
-    def _process_candles_data(self, candles_data):
+    def _process_candles_data(self, candles):
         """Process candles data for PocketOption"""
-        if isinstance(candles_data, dict) and 'asset' in candles_data:
-            return {
-                'type': 'candles',
-                'asset': candles_data['asset'],
-                'timeframe': candles_data.get('period'),
-                'candles': candles_data.get('candles', []),
-                'from': candles_data.get('from'),
-                'to': candles_data.get('to'),
-                'raw_data': candles_data
-            }
-        return None
+        return CandlesMsg(candles.asset, candles.period, candles.candles, candles.from_, candles.to,
+                          candles if self.include_raw else None)
     
     def _process_assets_data(self, assets_data):
         """Process available assets list from PocketOption"""
         if isinstance(assets_data, list):
-            return {
-                'type': 'assets_list',
-                'assets': assets_data,
-                'count': len(assets_data),
-                'raw_data': assets_data
-            }
+            return AssetsMsg(assets_data, assets_data if self.include_raw else None)
         elif isinstance(assets_data, dict) and 'instruments' in assets_data:
-            return {
-                'type': 'assets_list',
-                'assets': assets_data.get('instruments', []),
-                'count': len(assets_data.get('instruments', [])),
-                'raw_data': assets_data
-            }
+            return AssetsMsg(assets_data.get('instruments', []), assets_data if self.include_raw else None)
         return None
     
     def _process_balance_data(self, balance_data):
         """Simple balance verification for NGN account"""
-        if isinstance(balance_data, dict):
-            currency = balance_data.get('currency', 'NGN')
-            balance = balance_data.get('balance', 0)
-            
-            if currency == 'NGN':
-                logger.info(f"✅ Connected to NGN Live Account | Balance: {balance:,.2f} NGN")
-            else:
-                logger.warning(f"⚠️  Unexpected currency: {currency} | Expected: NGN")
-            
-            return {'type': 'balance', 'currency': currency, 'balance': balance}
-        return None
+        currency = balance_data.currency
+        balance = balance_data.balance
+        
+        if currency == 'NGN':
+            logger.info(f"✅ Connected to NGN Live Account | Balance: {balance:,.2f} NGN")
+        else:
+            logger.warning(f"⚠️  Unexpected currency: {currency} | Expected: NGN")
+        
+        return BalanceMsg(currency, balance)
     
     def _process_counters_data(self, counters_data):
         """Process counters data (notifications, etc.)"""
-        if isinstance(counters_data, dict):
-            return {
-                'type': 'counters',
-                'pending_withdrawal': counters_data.get('pending-withdrawal', 0),
-                'achievements': counters_data.get('achievements', 0),
-                'support_tickets': counters_data.get('support', 0),
-                'raw_data': counters_data
-            }
-        return None
+        return CountersMsg(counters_data.pending_withdrawal, counters_data.achievements,
+                           counters_data.support, counters_data if self.include_raw else None)
+    
+    def recycle(self, msg):
+        """Return a consumed TickMsg to the pool - the caller must not use it afterwards"""
+        if type(msg) is TickMsg and len(self._tick_pool) < TICK_POOL_SIZE:
+            msg.raw_data = None
+            self._tick_pool.append(msg)
     
     def get_trading_decision(self, processed_data):
         """
         Generate trading decisions based on processed data
         This will be expanded with your trading strategies
         """
-        if processed_data and processed_data['type'] == 'tick':
+        if processed_data and processed_data.type == 'tick':
             # Add your trading logic here
-            asset = processed_data['asset']
-            price = processed_data['price']
+            asset = processed_data.asset
+            price = processed_data.price
             
             # Example simple logic - replace with your strategies
-            logger.debug(f"Tick received for {asset}: {price}")
+            logger.debug("Tick received for %s: %s", asset, price)
             
         return None
@@ -1,3 +1,6 @@
+import time
+from collections import deque
+import numpy as np
 import pandas as pd
 from strategies.trend_reversal import TrendReversalStrategy
 from strategies.trend_following import TrendFollowingStrategy
@@ -5,12 +8,17 @@ from utils.logger import setup_logger
 
 logger = setup_logger('strategy_engine')
 
+CANDLE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
 class StrategyEngine:
     def __init__(self, data_processor):
         self.data_processor = data_processor
         self.strategies = {}
-        self.signals = []
         self.max_signals_history = 100
+        self.signals = deque(maxlen=self.max_signals_history)
+        
+        # Reusable (rows, 6) float64 candle buffers keyed by (asset, timeframe)
+        self._candle_buffers = {}
         
         # Initialize ALL strategies
         self._initialize_strategies()
@@ -23,6 +31,14 @@ class StrategyEngine:
         self.strategies['trend_following_1m'] = TrendFollowingStrategy(timeframe='1m')
         self.strategies['trend_following_2m'] = TrendFollowingStrategy(timeframe='2m')
         self.strategies['trend_following_3m'] = TrendFollowingStrategy(timeframe='3m')
+        
+        # Timeframe -> strategy, resolved once instead of per candles update
+        self._strategy_by_tf = {
+            '5m': self.strategies['trend_reversal_5m'],
+            '1m': self.strategies['trend_following_1m'],
+            '2m': self.strategies['trend_following_2m'],
+            '3m': self.strategies['trend_following_3m'],
+        }
     
     def process_data(self, processed_data):
         """
@@ -33,10 +49,14 @@ class StrategyEngine:
             if not processed_data:
                 return None
                 
-            data_type = processed_data.get('type')
+            data_type = processed_data.type
             
             if data_type == 'tick':
-                return self._process_tick_signal(processed_data)
+                try:
+                    return self._process_tick_signal(processed_data)
+                finally:
+                    # Ticks are consumed here, so hand the object back to the processor's pool
+                    self.data_processor.recycle(processed_data)
                 
             elif data_type == 'candles':  # Changed from 'instrument_update' to 'candles'
                 return self._process_candles_signal(processed_data)  # Renamed method
@@ -49,12 +69,12 @@ class StrategyEngine:
     
     def _process_tick_signal(self, tick_data):
         """Process tick data for signals - more useful for PocketOption"""
-        asset = tick_data.get('asset', '')
-        price = tick_data.get('price', 0)
-        bid = tick_data.get('bid', 0)
-        ask = tick_data.get('ask', 0)
+        asset = tick_data.asset
+        price = tick_data.price
+        bid = tick_data.bid
+        ask = tick_data.ask
         
-        logger.debug(f"Processing tick: {asset} | Price: {price} | Bid/Ask: {bid}/{ask}")
+        logger.debug("Processing tick: %s | Price: %s | Bid/Ask: %s/%s", asset, price, bid, ask)
         
         # For PocketOption, tick data can be more relevant for certain strategies
         # You might want to implement tick-based strategies here
@@ -63,15 +83,20 @@ class StrategyEngine:
     
     def _process_candles_signal(self, candles_data):  # Renamed from _process_ohlc_signal
         """Process candles data for signals using our strategies"""
-        asset = candles_data.get('asset', '')
-        candles = candles_data.get('candles', [])
-        timeframe = candles_data.get('timeframe', '5m')  # Changed from 'period' to 'timeframe'
+        asset = candles_data.asset
+        candles = candles_data.candles
+        timeframe = candles_data.timeframe  # Changed from 'period' to 'timeframe'
+        
+        logger.debug("Processing candles: %s with %d candles (TF: %s)", asset, len(candles), timeframe)
         
-        logger.debug(f"Processing candles: {asset} with {len(candles)} candles (TF: {timeframe})")
+        # Too few candles for the strategy means 'hold' - skip the DataFrame build
+        strategy = self._strategy_by_tf.get(timeframe)
+        if strategy is None or len(candles) < strategy.min_required_bars:
+            return None
         
         # Convert candles to DataFrame for our strategies
         if candles and len(candles) > 0:
-            df = self._candles_to_dataframe(candles)
+            df = self._candles_to_dataframe(candles, key=(asset, timeframe))
             
             if df.empty:
                 return None
@@ -83,7 +108,7 @@ class StrategyEngine:
             if signal and signal.get('signal') != 'hold':
                 signal['asset'] = asset
                 signal['timeframe'] = timeframe
-                signal['timestamp'] = pd.Timestamp.now()  # Add current timestamp
+                signal['timestamp'] = time.time_ns()  # Epoch ns; pd.Timestamp(ts, unit='ns') when needed
                 self._store_signal(signal)
                 
                 logger.info(f"📈 Signal generated: {signal['signal'].upper()} for {asset} ({timeframe}) "
@@ -94,27 +119,30 @@ class StrategyEngine:
     
     def _run_strategy_for_timeframe(self, df, timeframe):
         """Run the appropriate strategy based on timeframe"""
-        strategy_key = None
-        
-        if timeframe == '5m':
-            strategy_key = 'trend_reversal_5m'
-        elif timeframe == '1m':
-            strategy_key = 'trend_following_1m'
-        elif timeframe == '2m':
-            strategy_key = 'trend_following_2m'
-        elif timeframe == '3m':
-            strategy_key = 'trend_following_3m'
+        strategy = self._strategy_by_tf.get(timeframe)
         
-        if strategy_key and strategy_key in self.strategies:
+        if strategy:
             try:
-                return self.strategies[strategy_key].analyze(df)
+                return strategy.analyze(df)
             except Exception as e:
-                logger.error(f"Error running strategy {strategy_key}: {e}")
+                logger.error(f"Error running strategy {strategy.name}: {e}")
         
         return {'signal': 'hold', 'confidence': 0}
     
-    def _candles_to_dataframe(self, candles):
-        """Convert PocketOption candles list to pandas DataFrame"""
+    def _candle_buffer(self, key, rows):
+        """Get the candle buffer for key, reallocating only when it is too small"""
+        buffer = self._candle_buffers.get(key)
+        if buffer is None or len(buffer) < rows:
+            buffer = np.empty((rows, 6), dtype=np.float64)
+            self._candle_buffers[key] = buffer
+        return buffer
+    
+    def _candles_to_dataframe(self, candles, key=None):
+        """
+        Convert PocketOption candles list to pandas DataFrame
+        List-format candles with a key are written into that key's reusable buffer,
+        so the frame is only valid until the next update for the same key
+        """
         if not candles:
             return pd.DataFrame()
             
@@ -123,48 +151,57 @@ class StrategyEngine:
             # OR could be objects with keys - we need to handle both
             if isinstance(candles[0], (list, tuple)):
                 # List format: [timestamp, open, high, low, close, volume]
-                df = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')  # Assuming Unix timestamp
+                # One float64 block built in C - no per-column dtype inference or coercion
+                try:
+                    if key is None:
+                        values = np.asarray(candles, dtype=np.float64)
+                    else:
+                        values = self._candle_buffer(key, len(candles))[:len(candles)]
+                        values[:] = candles
+                except (ValueError, TypeError):
+                    # A non-numeric cell - take the slow path so only that cell becomes NaN
+                    df = pd.DataFrame(candles, columns=['timestamp'] + CANDLE_COLUMNS)
+                    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
+                    df.set_index('timestamp', inplace=True)
+                    return df.apply(pd.to_numeric, errors='coerce').astype(np.float64)
+                index = pd.to_datetime(values[:, 0], unit='s')  # Assuming Unix timestamp
+                index.name = 'timestamp'
+                return pd.DataFrame(values[:, 1:6], index=index, columns=CANDLE_COLUMNS, copy=False)
                 
             elif isinstance(candles[0], dict):
                 # Dictionary format: {ts, open, high, low, close, volume}
-                df = pd.DataFrame(candles)
+                df = pd.DataFrame.from_records(candles)
                 if 'ts' in df.columns:  # PocketOption uses 'ts' for timestamp
                     df['timestamp'] = pd.to_datetime(df['ts'], unit='s')
                 elif 'timestamp' in df.columns:
                     df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
                 else:
-                    # Create a timestamp index if no timestamp provided
-                    df['timestamp'] = pd.date_range(start=pd.Timestamp.now() - pd.Timedelta(minutes=len(df)), 
-                                                   periods=len(df), freq='T')
+                    # Create a one-minute timestamp index ending now if no timestamp provided
+                    now_s = int(time.time())
+                    df['timestamp'] = np.arange(now_s - len(df) * 60, now_s, 60, dtype='int64').astype('datetime64[s]')
+                
+                df.set_index('timestamp', inplace=True)
+                
+                # Ensure numeric columns; unparseable cells become NaN
+                numeric_cols = [col for col in CANDLE_COLUMNS if col in df.columns]
+                df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors='coerce').astype(np.float64)
+                return df
             
             else:
                 logger.warning(f"Unknown candle format: {type(candles[0])}")
                 return pd.DataFrame()
             
-            df.set_index('timestamp', inplace=True)
-            
-            # Ensure numeric columns
-            numeric_cols = ['open', 'high', 'low', 'close', 'volume']
-            for col in numeric_cols:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            return df
-            
         except Exception as e:
             logger.error(f"Error converting candles to DataFrame: {e}")
             return pd.DataFrame()
     
     def _store_signal(self, signal):
-        """Store signal in history"""
+        """Store signal in history (the deque drops the oldest past max_signals_history)"""
         self.signals.append(signal)
-        if len(self.signals) > self.max_signals_history:
-            self.signals = self.signals[-self.max_signals_history:]
     
     def get_recent_signals(self, count=10):
         """Get recent signals"""
-        return self.signals[-count:] if self.signals else []
+        return list(self.signals)[-count:] if self.signals else []
     
     def get_signals_by_asset(self, asset):
         """Get signals for a specific asset"""
@@ -172,4 +209,4 @@ class StrategyEngine:
     
     def clear_signals(self):
         """Clear all signals history"""
-        self.signals = []
+        self.signals.clear()
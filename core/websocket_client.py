@@ -1,84 +1,125 @@
 import websocket
 import json
+import orjson
 import threading
 import time
 import logging
 import base64
 import os
+import sys
+from itertools import islice
 from config.credentials import Credentials
 from utils.logger import setup_logger
 
 logger = setup_logger('websocket_client')
 
+# Socket.IO frame markers; websocket-client may hand us either str or bytes
+DATA_FRAME_PREFIX = '42['
+DATA_FRAME_PREFIX_BYTES = b'42['
+PING_FRAMES = ('2', b'2')
+AUTH_MSG_TEMPLATE = '42["auth",%s]'
+PONG_FRAME = b'3'  # Outbound frames go out pre-encoded as text-opcode bytes
+
+# Interned event names, used as dispatch keys and for comparisons
+_TICK = sys.intern("tick")
+_CANDLES = sys.intern("candles")
+_ASSETS = sys.intern("assets")
+_BALANCE = sys.intern("balance")
+_QUOTES = sys.intern("quotes")
+_AUTH = sys.intern("auth")
+_AUTH_SUCCESS = sys.intern("auth/success")
+_COUNTERS = sys.intern("counters/all/success")
+_PING_SERVER = sys.intern("ping-server")
+
 class PocketOptionWebSocketClient:
     def __init__(self):
         self.ws = None
         self.connected = False
         self.authenticated = False
+        self._open_event = threading.Event()  # Set by on_open so connect() wakes immediately
         self.ping_interval = 25000
         self.ping_timeout = 20000
         self.sid = None
         self.message_count = 0
         self.on_message_callback = None
+        self._auth_frame = self._build_auth_frame().encode('utf-8')  # Sent as-is on every '40' handshake
         self.available_assets = set()  # Dynamic asset tracking
+        self._assets_finalized = False  # Set once PocketOption sends the full assets list
         self.received_data_types = set()  # Track what data PocketOption sends
         
+        # Message type -> handler, so dispatch is a single dict lookup per frame
+        self._handlers = {
+            _AUTH: self._handle_auth_message,
+            _ASSETS: self._handle_assets_message,
+            _TICK: self._handle_tick_message,
+            _CANDLES: self._handle_candles_message,
+            _QUOTES: self._handle_quotes_message,
+            _BALANCE: self._handle_balance_message,
+            _COUNTERS: self._handle_counters_message,
+            _PING_SERVER: self._handle_ping_server,
+        }
+        
     def get_manual_session_token(self):
         """Get session token for PocketOption"""
         logger.info("🔐 Using manually provided SESSION_TOKEN from environment variables")
         return Credentials.SESSION_TOKEN
 
+    def _build_auth_frame(self):
+        """Serialize the PocketOption auth frame from the loaded credentials"""
+        auth_data = {
+            "sessionToken": Credentials.SESSION_TOKEN,
+            "uid": Credentials.USER_ID,
+            "lang": "en",
+            "currentUrl": "cabinet",
+            "isChart": 1
+        }
+        return AUTH_MSG_TEMPLATE % json.dumps(auth_data, separators=(",", ":"))
+
     def on_open(self, ws):
         logger.info("✅ WebSocket connected to PocketOption")
         self.connected = True
+        self._open_event.set()
 
     def on_message(self, ws, message):
         try:
             self.message_count += 1
-            
-            if isinstance(message, bytes):
-                message = message.decode('utf-8')
-
-            logger.debug(f"Received #{self.message_count}: {message[:200]}...")
-
-            # Handle different message types based on PocketOption protocol
-            if message.startswith('0{'):
-                conn_info = json.loads(message[1:])
-                self.sid = conn_info.get('sid')
-                self.ping_interval = conn_info.get('pingInterval', 25000)
-                self.ping_timeout = conn_info.get('pingTimeout', 20000)
-                logger.info(f"Connection established. SID: {self.sid}")
-
-            elif message == '40':
-                logger.info("Namespace connected, sending PocketOption authentication")
-                auth_data = {
-                    "sessionToken": Credentials.SESSION_TOKEN,
-                    "uid": Credentials.USER_ID,
-                    "lang": "en",
-                    "currentUrl": "cabinet",
-                    "isChart": 1
-                }
-                auth_msg = f'42["auth",{json.dumps(auth_data)}]'
-                ws.send(auth_msg)
-                logger.debug(f"Sent: {auth_msg}")
-
-            elif message.startswith('42['):
+
+            logger.debug("Received #%d: %.200s...", self.message_count, message)
+
+            is_bytes = isinstance(message, bytes)
+
+            # Data frames are the bulk of the traffic, so check them first.
+            # orjson parses UTF-8 bytes directly, so they never need decoding.
+            if message.startswith(DATA_FRAME_PREFIX_BYTES if is_bytes else DATA_FRAME_PREFIX):
                 try:
-                    json_data = json.loads(message[2:])
+                    json_data = orjson.loads(message[2:])
                     self.handle_data_message(json_data)
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     logger.warning(f"Failed to parse JSON: {message}")
 
-            elif message == '2':
-                ws.send('3')  # Pong response
+            elif message in PING_FRAMES:
+                ws.send(PONG_FRAME, opcode=websocket.ABNF.OPCODE_TEXT)  # Pong response
                 logger.debug("Sent pong response")
 
-            elif message == '42["ping-server"]':
-                ws.send('3')  # Pong response
-                logger.debug("Responded to ping-server")
-
             else:
-                logger.debug(f"Unhandled message: {message}")
+                if is_bytes:
+                    message = message.decode('utf-8')
+
+                # Handle different message types based on PocketOption protocol
+                if message.startswith('0{'):
+                    conn_info = orjson.loads(message[1:])
+                    self.sid = conn_info.get('sid')
+                    self.ping_interval = conn_info.get('pingInterval', 25000)
+                    self.ping_timeout = conn_info.get('pingTimeout', 20000)
+                    logger.info(f"Connection established. SID: {self.sid}")
+
+                elif message == '40':
+                    logger.info("Namespace connected, sending PocketOption authentication")
+                    ws.send(self._auth_frame, opcode=websocket.ABNF.OPCODE_TEXT)
+                    logger.debug("Sent: %s", self._auth_frame)
+
+                else:
+                    logger.debug("Unhandled message: %s", message)
 
             # Send raw message to callback for processing
             if self.on_message_callback:
@@ -100,48 +141,37 @@ class PocketOptionWebSocketClient:
         
         logger.info(f"📨 Received message type: {message_type}")
 
-        if message_type == "auth/success":
+        handler = self._handlers.get(message_type)
+        if handler:
+            handler(message_data)
+
+        elif message_type == _AUTH_SUCCESS:
             logger.info("✅ PocketOption authentication successful!")
             self.authenticated = True
             # Don't auto-subscribe - wait for PocketOption to push data
             logger.info("🔄 Waiting for PocketOption data streams...")
             self._log_data_patterns()
 
-        elif message_type == "auth":
-            logger.info(f"Auth response: {message_data}")
-
-        elif message_type == "assets":
-            self._handle_assets_message(message_data)
-
-        elif message_type == "tick":
-            self._handle_tick_message(message_data)
-
-        elif message_type == "candles":
-            self._handle_candles_message(message_data)
-
-        elif message_type == "quotes":
-            self._handle_quotes_message(message_data)
-
-        elif message_type == "balance":
-            self._handle_balance_message(message_data)
-
-        elif message_type == "counters/all/success":
-            logger.debug(f"Counters update: {message_data}")
-
         else:
             # Log unknown message types to understand PocketOption's API
             logger.info(f"🔍 Unknown message type: {message_type} - Data: {message_data}")
 
+    def _handle_auth_message(self, auth_data):
+        """Log auth responses"""
+        logger.info(f"Auth response: {auth_data}")
+
     def _handle_assets_message(self, assets_data):
         """Dynamically handle assets list if provided"""
         if isinstance(assets_data, list) and assets_data:
             logger.info(f"🎯 Received {len(assets_data)} assets")
             self.available_assets.update(assets_data)
+            self._assets_finalized = True
             self._update_trading_settings()
         elif isinstance(assets_data, dict) and 'instruments' in assets_data:
             instruments = assets_data.get('instruments', [])
             logger.info(f"🎯 Received {len(instruments)} instruments")
             self.available_assets.update(instruments)
+            self._assets_finalized = True
             self._update_trading_settings()
 
     def _handle_tick_message(self, tick_data):
@@ -150,11 +180,11 @@ class PocketOptionWebSocketClient:
             asset = tick_data.get('asset', 'unknown')
             price = tick_data.get('price', 0)
             
-            # Track asset from tick data
-            if asset and asset != 'unknown':
+            # Track asset from tick data until the full assets list has arrived
+            if not self._assets_finalized and asset and asset != 'unknown':
                 self.available_assets.add(asset)
                 
-            logger.debug(f"📈 Tick: {asset} = {price}")
+            logger.debug("📈 Tick: %s = %s", asset, price)
 
     def _handle_candles_message(self, candles_data):
         """Handle candles data dynamically"""
@@ -166,7 +196,7 @@ class PocketOptionWebSocketClient:
             if asset and asset != 'unknown':
                 self.available_assets.add(asset)
                 
-            logger.debug(f"📊 Candles: {asset} - {len(candles)} candles")
+            logger.debug("📊 Candles: %s - %d candles", asset, len(candles))
 
     def _handle_quotes_message(self, quotes_data):
         """Handle quotes data if provided"""
@@ -175,7 +205,7 @@ class PocketOptionWebSocketClient:
             # Track asset from quotes data
             if asset and asset != 'unknown':
                 self.available_assets.add(asset)
-            logger.debug(f"💹 Quotes: {quotes_data}")
+            logger.debug("💹 Quotes: %s", quotes_data)
 
     def _handle_balance_message(self, balance_data):
         """Handle balance updates"""
@@ -184,6 +214,15 @@ class PocketOptionWebSocketClient:
             balance = balance_data.get('balance', 0)
             logger.info(f"💰 Balance update: {balance:,.2f} {currency}")
 
+    def _handle_counters_message(self, counters_data):
+        """Handle counters updates (notifications, etc.)"""
+        logger.debug("Counters update: %s", counters_data)
+
+    def _handle_ping_server(self, _):
+        """Answer PocketOption's ping-server event"""
+        self.ws.send(PONG_FRAME, opcode=websocket.ABNF.OPCODE_TEXT)  # Pong response
+        logger.debug("Responded to ping-server")
+
     def _update_trading_settings(self):
         """Dynamically update trading settings with discovered assets"""
         try:
@@ -191,7 +230,7 @@ class PocketOptionWebSocketClient:
             
             if self.available_assets:
                 # Convert set to list and take reasonable number of assets
-                assets_list = list(self.available_assets)[:50]  # Limit to 50 assets
+                assets_list = list(islice(self.available_assets, 50))  # Limit to 50 assets
                 TRADING_SETTINGS['assets'] = assets_list
                 logger.info(f"🔄 Updated trading settings with {len(assets_list)} assets")
                 
@@ -249,14 +288,13 @@ class PocketOptionWebSocketClient:
                 header=headers
             )
 
+            self._open_event.clear()
             wst = threading.Thread(target=self.ws.run_forever)
             wst.daemon = True
             wst.start()
 
-            for i in range(50):
-                if self.connected:
-                    return True
-                time.sleep(0.1)
+            if self._open_event.wait(timeout=5.0):
+                return True
 
             logger.error("WebSocket connection timeout")
             return False
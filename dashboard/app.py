@@ -1,103 +1,243 @@
+import eventlet
+# Must run before flask/socketio import the stdlib. main.py patches first when it is the
+# entry point; this covers running the dashboard module on its own (a repeat call is a no-op)
+eventlet.monkey_patch(socket=True, select=True, thread=True, time=True)
+
+import gzip
 import os
-from flask import Flask, jsonify, request, send_file
-from flask_socketio import SocketIO
+import time
+from collections import Counter, deque
+from itertools import islice
+from flask import Flask, Response, jsonify, request, send_file
+from flask_socketio import SocketIO, emit, join_room, leave_room
 import json
+import orjson
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
 
 # Get absolute path to templates
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 TEMPLATE_DIR = os.path.join(BASE_DIR, 'templates')
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
 INDEX_PATH = os.path.join(TEMPLATE_DIR, 'index.html')
 
-app = Flask(__name__)
+app = Flask(__name__, static_folder=STATIC_DIR)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev_secret_key')
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet')
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 3600  # Let browsers cache the dashboard for an hour
+
+# Vendored static files with the version in the name - their content never changes
+_IMMUTABLE_STATIC = {'js/socket.io-4.5.0.min.js'}
+
+class _OrjsonCodec:
+    """json-module stand-in so Socket.IO packets are encoded with orjson"""
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
+# Polling responses are gzip/deflated from 256 bytes up (engineio's default of 1 KiB skips
+# every signal frame); websocket clients get permessage-deflate negotiated by eventlet
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet', json=_OrjsonCodec,
+                    http_compression=True, compression_threshold=256)
+
+ALL_SIGNALS_ROOM = '__all_signals__'  # Clients that have not subscribed to specific assets
+ASSET_ROOM_PREFIX = 'asset:'  # Keeps client-chosen asset rooms apart from sid and reserved rooms
+_client_count = 0  # Connected Socket.IO clients; eventlet is cooperative so a plain int is safe
+
+def _asset_names(assets):
+    """Client-supplied asset or list of assets -> non-empty str names; anything else is ignored"""
+    if isinstance(assets, str):
+        assets = [assets]
+    elif not isinstance(assets, (list, tuple)):
+        return []
+    return [asset for asset in assets if isinstance(asset, str) and asset]
+
+class Performance:
+    """Dashboard performance counters; slotted, no per-instance dict"""
+    FIELDS = ('total_signals', 'winning_signals', 'losing_signals', 'total_profit',
+              'active_assets_count', 'connection_status')
+    __slots__ = FIELDS + ('_active_assets',)
+    
+    def __init__(self):
+        self._active_assets = set()
+        self.total_signals = 0
+        self.winning_signals = 0
+        self.losing_signals = 0
+        self.total_profit = 0.0
+        self.active_assets_count = 0
+        self.connection_status = 'disconnected'
+    
+    def record_signal(self, asset):
+        """Count one signal and its asset in a single call"""
+        self.total_signals += 1
+        if asset != 'Unknown':
+            active = self._active_assets
+            active.add(asset)
+            self.active_assets_count = len(active)
+    
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
 
 class Dashboard:
+    __slots__ = ('signals', 'performance', 'connection_stats', '_perf_snapshot_dict',
+                 '_perf_cached_bytes', '_signals_json_bytes', '_perf_dirty', '_flush_scheduled',
+                 '_room_counts', '_client_rooms')
+    
     def __init__(self):
-        self.signals = []
-        self.performance = {
-            'total_signals': 0,
-            'winning_signals': 0,
-            'losing_signals': 0,
-            'total_profit': 0,
-            'active_assets': set(),
-            'connection_status': 'disconnected'
-        }
+        self.signals = deque(maxlen=20)  # Newest first; only the recent 20 are kept
+        self.performance = Performance()
         self.connection_stats = {
             'websocket_connected': False,
             'authenticated': False,
             'last_message': None,
             'message_count': 0
         }
+        self._perf_snapshot_dict = None  # performance.as_dict(), dropped on mutation
+        self._perf_cached_bytes = None  # orjson encoding of the same snapshot
+        self._signals_json_bytes = b'[]'  # orjson encoding of signals, None after a new signal
+        self._perf_dirty = False
+        self._flush_scheduled = False
+        self._room_counts = Counter()  # Signal room -> number of clients in it
+        self._client_rooms = {}  # sid -> signal rooms that client joined
     
     def add_signal(self, signal):
+        timestamp = signal.get('timestamp', '')
+        if isinstance(timestamp, int):
+            timestamp //= 1_000_000  # Strategy engine stamps epoch ns; the browser's Date() wants ms
+        
         formatted_signal = {
             'id': len(self.signals) + 1,
             'asset': signal.get('asset', 'Unknown'),
             'direction': signal.get('signal', 'hold').upper(),
             'confidence': signal.get('confidence', 0),
-            'timestamp': signal.get('timestamp', ''),
+            'timestamp': timestamp,
             'timeframe': signal.get('timeframe', ''),
             'type': signal.get('type', 'unknown')
         }
         
-        self.signals.insert(0, formatted_signal)
-        self.signals = self.signals[:20]  # Keep only recent 20 signals
+        self.signals.appendleft(formatted_signal)
+        self._signals_json_bytes = None
         
-        # Track active assets
-        if formatted_signal['asset'] != 'Unknown':
-            self.performance['active_assets'].add(formatted_signal['asset'])
+        self.performance.record_signal(formatted_signal['asset'])
+        self._perf_changed()
         
-        self.performance['total_signals'] += 1
-        
-        socketio.emit('new_signal', formatted_signal)
-        socketio.emit('performance_update', self.performance)
+        # Only wake clients watching this asset (or everything); skip the emit if nobody is
+        rooms = [room for room in (ALL_SIGNALS_ROOM, ASSET_ROOM_PREFIX + str(formatted_signal['asset']))
+                 if self._room_counts[room]]
+        if rooms:
+            socketio.emit('dashboard_update', {'signal': formatted_signal}, to=rooms)
+        self._mark_perf_dirty()
     
     def update_connection_status(self, status_data):
         """Update WebSocket connection status"""
         self.connection_stats.update(status_data)
-        self.performance['connection_status'] = 'connected' if status_data.get('websocket_connected') else 'disconnected'
+        self.performance.connection_status = 'connected' if status_data.get('websocket_connected') else 'disconnected'
+        self._perf_changed()
         
-        socketio.emit('connection_update', self.connection_stats)
-        socketio.emit('performance_update', self.performance)
+        self._mark_perf_dirty()
+    
+    def connect_client(self, sid):
+        """New clients see all signals until they subscribe - call from the connect handler"""
+        self._join_room(sid, ALL_SIGNALS_ROOM)
+    
+    def subscribe(self, sid, assets):
+        """Limit a client to the given asset(s) - call from its socket handler"""
+        assets = _asset_names(assets)
+        for asset in assets:
+            self._join_room(sid, ASSET_ROOM_PREFIX + asset)
+        if assets:
+            self._leave_room(sid, ALL_SIGNALS_ROOM)
+    
+    def unsubscribe(self, sid, assets):
+        """Drop asset subscriptions; with none left the client sees all signals again"""
+        for asset in _asset_names(assets):
+            self._leave_room(sid, ASSET_ROOM_PREFIX + asset)
+        if not self._client_rooms.get(sid):
+            self._join_room(sid, ALL_SIGNALS_ROOM)
+    
+    def _join_room(self, sid, room):
+        rooms = self._client_rooms.setdefault(sid, set())
+        if room not in rooms:
+            join_room(room)
+            rooms.add(room)
+            self._room_counts[room] += 1
+    
+    def _leave_room(self, sid, room):
+        rooms = self._client_rooms.get(sid)
+        if rooms and room in rooms:
+            leave_room(room)
+            rooms.discard(room)
+            self._release_room(room)
+    
+    def drop_client(self, sid):
+        """Forget a disconnected client's rooms (the server already left them)"""
+        for room in self._client_rooms.pop(sid, ()):
+            self._release_room(room)
+    
+    def _release_room(self, room):
+        self._room_counts[room] -= 1
+        if self._room_counts[room] <= 0:
+            del self._room_counts[room]
+    
+    def signals_json(self):
+        """Encoded signal list, re-serialised at most once per new signal"""
+        if self._signals_json_bytes is None:
+            self._signals_json_bytes = orjson.dumps(list(self.signals))
+        return self._signals_json_bytes
+    
+    def _perf_changed(self):
+        self._perf_snapshot_dict = None
+        self._perf_cached_bytes = None
+    
+    def perf_snapshot(self):
+        """Performance payload for clients - treat as read-only, it is shared until the next change"""
+        if self._perf_snapshot_dict is None:
+            self._perf_snapshot_dict = self.performance.as_dict()
+        return self._perf_snapshot_dict
+    
+    def perf_json(self):
+        """Encoded performance payload, re-serialised only after a change"""
+        if self._perf_cached_bytes is None:
+            self._perf_cached_bytes = orjson.dumps(self.perf_snapshot())
+        return self._perf_cached_bytes
+    
+    def _mark_perf_dirty(self):
+        """Coalesce performance/connection broadcasts - at most one flush is pending at a time"""
+        self._perf_dirty = True
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            socketio.start_background_task(self._flush_perf)
+    
+    def _flush_perf(self):
+        """Emit the latest snapshot once per 50 ms window (~20 Hz cap)"""
+        socketio.sleep(0.05)
+        self._flush_scheduled = False
+        if self._perf_dirty:
+            self._perf_dirty = False
+            socketio.emit('dashboard_update', {
+                'performance': self.perf_snapshot(),
+                'connection': self.connection_stats
+            })
 
 # Global dashboard instance
 dashboard = Dashboard()
 
-@app.route('/')
-def index():
-    """Serve dashboard HTML - guaranteed to work"""
-    try:
-        # Try to find the template file
-        possible_paths = [
-            '/opt/render/project/src/templates/index.html',  # Render path
-            os.path.join(os.path.dirname(__file__), 'templates', 'index.html'),  # Relative path
-            os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates', 'index.html'),  # Main directory
-            'templates/index.html'  # Current directory
-        ]
-        
-        for template_path in possible_paths:
-            if os.path.exists(template_path):
-                with open(template_path, 'r', encoding='utf-8') as f:
-                    return f.read(), 200, {'Content-Type': 'text/html'}
-        
-        # If no template found, CREATE IT PROGRAMMATICALLY
-        return create_fallback_dashboard()
-        
-    except Exception as e:
-        return create_fallback_dashboard()
-
-def create_fallback_dashboard():
-    """Create dashboard HTML programmatically as fallback"""
-    html_content = """
+# Dashboard HTML used when no template file is deployed
+_FALLBACK_HTML = """
     <!DOCTYPE html>
     <html lang="en">
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>PocketOption Trading Bot Dashboard</title>
-        <script src="https://cdn.socket.io/4.5.0/socket.io.min.js"></script>
-        <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+        <script src="/static/js/socket.io-4.5.0.min.js"></script>
         <style>
             body { font-family: Arial, sans-serif; margin: 20px; background: #f4f4f4; }
             .header { background: #4a6baf; color: white; padding: 20px; border-radius: 5px; }
@@ -162,8 +302,7 @@ def create_fallback_dashboard():
         <script>
             const socket = io();
             
-            // Handle connection status updates
-            socket.on('connection_update', function(stats) {
+            function updateConnection(stats) {
                 document.getElementById('connection-status').textContent = 
                     stats.websocket_connected ? '✅ Connected' : '❌ Disconnected';
                 document.getElementById('connection-status').className = 
@@ -174,10 +313,9 @@ def create_fallback_dashboard():
                 document.getElementById('message-count').textContent = stats.message_count;
                 document.getElementById('last-activity').textContent = 
                     stats.last_message || 'Never';
-            });
+            }
             
-            // Handle new trading signals
-            socket.on('new_signal', function(signal) {
+            function addSignal(signal) {
                 const container = document.getElementById('signals-container');
                 const signalElement = document.createElement('div');
                 signalElement.className = 'signal ' + signal.direction.toLowerCase();
@@ -194,19 +332,33 @@ def create_fallback_dashboard():
                 if (container.children.length > 20) {
                     container.removeChild(container.lastChild);
                 }
-            });
+            }
             
-            // Handle performance updates
-            socket.on('performance_update', function(data) {
+            function updatePerformance(data) {
                 document.getElementById('total-signals').textContent = data.total_signals;
                 document.getElementById('winning-signals').textContent = data.winning_signals;
                 document.getElementById('losing-signals').textContent = data.losing_signals;
                 document.getElementById('total-profit').textContent = '$' + data.total_profit.toFixed(2);
-                document.getElementById('active-assets').textContent = data.active_assets ? data.active_assets.size : 0;
+                document.getElementById('active-assets').textContent = data.active_assets_count || 0;
                 
                 const winRate = data.total_signals > 0 ? 
                     ((data.winning_signals / data.total_signals) * 100).toFixed(1) : 0;
                 document.getElementById('win-rate').textContent = winRate + '%';
+            }
+            
+            // Handle connection status updates
+            socket.on('connection_update', updateConnection);
+            
+            // Recent signals arrive newest first - add oldest first so the newest ends on top
+            socket.on('signals_bulk', function(signals) {
+                for (let i = signals.length - 1; i >= 0; i--) addSignal(signals[i]);
+            });
+            
+            // One frame per server event - apply whichever parts it carries
+            socket.on('dashboard_update', function(update) {
+                if (update.connection) updateConnection(update.connection);
+                if (update.performance) updatePerformance(update.performance);
+                if (update.signal) addSignal(update.signal);
             });
             
             // Request initial data
@@ -215,45 +367,130 @@ def create_fallback_dashboard():
     </body>
     </html>
     """
-    return html_content, 200, {'Content-Type': 'text/html'}
+_FALLBACK_HTML_BYTES = _FALLBACK_HTML.encode('utf-8')
+# Compressed once here so no request pays for it
+_FALLBACK_HTML_GZ = gzip.compress(_FALLBACK_HTML_BYTES, 9)
+_FALLBACK_HTML_BR = brotli.compress(_FALLBACK_HTML_BYTES, quality=11) if HAS_BROTLI else None
+_HTML_HEADERS = {'Content-Type': 'text/html; charset=utf-8', 'Vary': 'Accept-Encoding'}
+_HTML_HEADERS_GZ = {**_HTML_HEADERS, 'Content-Encoding': 'gzip'}
+_HTML_HEADERS_BR = {**_HTML_HEADERS, 'Content-Encoding': 'br'}
 
-@app.route('/debug/filesystem')
-def debug_filesystem():
-    """Debug the entire filesystem structure"""
-    import os
-    base_dir = os.path.dirname(os.path.dirname(__file__))
+def _resolve_index_path():
+    """Find the dashboard template once; None means serve the built-in page"""
+    possible_paths = [
+        '/opt/render/project/src/templates/index.html',  # Render path
+        os.path.join(os.path.dirname(__file__), 'templates', 'index.html'),  # Relative path
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates', 'index.html'),  # Main directory
+        'templates/index.html'  # Current directory
+    ]
     
-    def list_files(startpath):
-        file_tree = {}
-        for root, dirs, files in os.walk(startpath):
-            level = root.replace(startpath, '').count(os.sep)
-            indent = ' ' * 2 * level
-            file_tree[os.path.basename(root)] = {
-                'files': files,
-                'path': root
-            }
-        return file_tree
+    for template_path in possible_paths:
+        # Skip candidates we can't read so the first request doesn't fail over at runtime
+        if os.path.exists(template_path) and os.access(template_path, os.R_OK):
+            return os.path.abspath(template_path)
+    return None
+
+# Resolved at import - i.e. at worker boot, before the first request - so '/' never
+# probes the filesystem (Flask 2.3 has no before_first_request hook to defer this to)
+_INDEX_FILE = _resolve_index_path()
+
+@app.after_request
+def cache_versioned_static(response):
+    """Cache version-named vendor files for a year; other static files keep the default max-age"""
+    if request.endpoint == 'static' and request.view_args.get('filename') in _IMMUTABLE_STATIC:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+@app.route('/')
+def index():
+    """Serve dashboard HTML - guaranteed to work"""
+    if _INDEX_FILE:
+        try:
+            # Streams the file (sendfile where the server supports it) and answers
+            # If-None-Match / If-Modified-Since with 304
+            return send_file(_INDEX_FILE, mimetype='text/html', conditional=True, etag=True)
+        except OSError:
+            pass
     
-    return jsonify({
-        'current_working_dir': os.getcwd(),
-        'base_dir': base_dir,
-        'filesystem': list_files('/opt/render/project/src'),
-        'templates_exists': os.path.exists('/opt/render/project/src/templates'),
-        'dashboard_files': os.listdir(os.path.dirname(__file__)) if os.path.exists(os.path.dirname(__file__)) else 'NOT_FOUND'
-    })
+    # If no template found, serve the built-in dashboard
+    return create_fallback_dashboard()
+
+def create_fallback_dashboard():
+    """Serve the built-in dashboard HTML, precompressed when the client accepts it"""
+    accepted = request.accept_encodings
+    if _FALLBACK_HTML_BR is not None and accepted['br']:
+        return _FALLBACK_HTML_BR, 200, _HTML_HEADERS_BR
+    if accepted['gzip']:
+        return _FALLBACK_HTML_GZ, 200, _HTML_HEADERS_GZ
+    return _FALLBACK_HTML_BYTES, 200, _HTML_HEADERS
+
+_FS_SNAPSHOT_TTL = 60  # seconds
+_fs_snapshot_cache = None  # (monotonic timestamp, snapshot dict)
 
-# Debug endpoint to check file existence
-@app.route('/debug/files')
-def debug_files():
-    files = {
-        'base_dir': BASE_DIR,
-        'template_dir': TEMPLATE_DIR,
-        'index_path': INDEX_PATH,
-        'index_exists': os.path.exists(INDEX_PATH),
-        'current_dir_files': os.listdir('.'),
-        'template_dir_files': os.listdir(TEMPLATE_DIR) if os.path.exists(TEMPLATE_DIR) else 'NOT FOUND'
-    }
-    return jsonify(files)
+def _fs_snapshot():
+    """File existence snapshot, refreshed at most once per TTL"""
+    global _fs_snapshot_cache
+    now = time.monotonic()
+    if _fs_snapshot_cache is None or now - _fs_snapshot_cache[0] > _FS_SNAPSHOT_TTL:
+        _fs_snapshot_cache = (now, {
+            'base_dir': BASE_DIR,
+            'template_dir': TEMPLATE_DIR,
+            'index_path': INDEX_PATH,
+            'index_exists': os.path.exists(INDEX_PATH),
+            'current_dir_files': os.listdir('.'),
+            'template_dir_files': os.listdir(TEMPLATE_DIR) if os.path.exists(TEMPLATE_DIR) else 'NOT FOUND'
+        })
+    return _fs_snapshot_cache[1]
+
+def _register_debug_routes(app):
+    """Filesystem debug endpoints - registered only for development / explicit opt-in"""
+    @app.route('/debug/filesystem')
+    def debug_filesystem():
+        """Debug the project filesystem structure (two levels deep, 500 entries max)"""
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+    
+        def list_files(startpath, max_depth=2, max_entries=500):
+            file_tree = {}
+            stack = [(startpath, 0)]
+            count = 0
+            while stack and count < max_entries:
+                root, depth = stack.pop()
+                files = []
+                try:
+                    with os.scandir(root) as it:
+                        for entry in it:
+                            count += 1
+                            if count > max_entries:
+                                break
+                            # DirEntry reuses the readdir type info - no extra stat() per entry
+                            if entry.is_dir(follow_symlinks=False):
+                                if depth < max_depth:
+                                    stack.append((entry.path, depth + 1))
+                            elif entry.is_file(follow_symlinks=False):
+                                files.append(entry.name)
+                except OSError:
+                    continue
+                file_tree[os.path.basename(root)] = {
+                    'files': files,
+                    'path': root
+                }
+            return file_tree
+    
+        return jsonify({
+            'current_working_dir': os.getcwd(),
+            'base_dir': base_dir,
+            'filesystem': list_files('/opt/render/project/src'),
+            'templates_exists': os.path.exists('/opt/render/project/src/templates'),
+            'dashboard_files': os.listdir(os.path.dirname(__file__)) if os.path.exists(os.path.dirname(__file__)) else 'NOT_FOUND'
+        })
+
+    # Debug endpoint to check file existence
+    @app.route('/debug/files')
+    def debug_files():
+        return jsonify(_fs_snapshot())
+
+if app.debug or os.environ.get('FLASK_ENV') == 'development' or os.environ.get('ENABLE_DEBUG_ROUTES'):
+    _register_debug_routes(app)
 
 @app.route('/health')
 def health_check():
@@ -265,11 +502,11 @@ def health_check():
 
 @app.route('/api/signals')
 def get_signals():
-    return jsonify(dashboard.signals)
+    return Response(dashboard.signals_json(), mimetype='application/json')
 
 @app.route('/api/performance')
 def get_performance():
-    return jsonify(dashboard.performance)
+    return Response(dashboard.perf_json(), mimetype='application/json')
 
 @app.route('/api/connection')
 def get_connection_status():
@@ -277,19 +514,37 @@ def get_connection_status():
 
 @socketio.on('connect')
 def handle_connect():
-    socketio.emit('clients_update', len(socketio.server.manager.rooms))
+    global _client_count
+    _client_count += 1
+    # Every client sees all signals until it subscribes to specific assets
+    dashboard.connect_client(request.sid)
+    socketio.emit('clients_update', _client_count)
     # Send current connection status to newly connected client
-    socketio.emit('connection_update', dashboard.connection_stats)
+    emit('connection_update', dashboard.connection_stats, to=request.sid)
 
 @socketio.on('disconnect')
 def handle_disconnect():
-    socketio.emit('clients_update', len(socketio.server.manager.rooms))
+    global _client_count
+    _client_count -= 1
+    dashboard.drop_client(request.sid)
+    socketio.emit('clients_update', _client_count)
 
 @socketio.on('get_initial_data')
 def handle_initial_data():
     """Send all current data to newly connected client"""
-    socketio.emit('connection_update', dashboard.connection_stats)
-    socketio.emit('performance_update', dashboard.performance)
-    # Send recent signals
-    for signal in dashboard.signals[:10]:
-        socketio.emit('new_signal', signal)
+    emit('dashboard_update', {
+        'performance': dashboard.perf_snapshot(),
+        'connection': dashboard.connection_stats
+    }, to=request.sid)
+    # Send recent signals (newest first) in one frame
+    emit('signals_bulk', list(islice(dashboard.signals, 10)), to=request.sid)
+
+@socketio.on('subscribe')
+def handle_subscribe(assets=None):
+    """Only receive signals for the given asset (or list of assets)"""
+    dashboard.subscribe(request.sid, assets)
+
+@socketio.on('unsubscribe')
+def handle_unsubscribe(assets=None):
+    """Stop receiving signals for the given asset(s); with none left, fall back to all signals"""
+    dashboard.unsubscribe(request.sid, assets)
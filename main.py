@@ -1,3 +1,6 @@
+import eventlet
+eventlet.monkey_patch()  # Before anything imports socket/ssl/threading (see dashboard/app.py)
+
 import signal
 import sys
 import threading
@@ -16,7 +16,7 @@ class PocketOptionDashboard {
             winning_signals: 0,
             losing_signals: 0,
             total_profit: 0,
-            active_assets: 0,
+            active_assets_count: 0,
             connection_status: 'disconnected'
         };
         
@@ -133,17 +133,27 @@ class PocketOptionDashboard {
             this.updateConnectionStatus();
         });
 
-        // Performance updates
-        this.socket.on('performance_update', (data) => {
-            this.performanceData = data;
-            this.updatePerformanceStats();
-            this.updateCharts();
+        // Initial signals arrive newest first in a single frame
+        this.socket.on('signals_bulk', (signals) => {
+            for (let i = signals.length - 1; i >= 0; i--) {
+                this.addSignalToUI(signals[i]);
+            }
         });
 
-        // New signals
-        this.socket.on('new_signal', (signal) => {
-            this.addSignalToUI(signal);
-            this.showNotification(`New ${signal.direction} signal for ${signal.asset}`);
+        // Batched updates - one frame carries whichever sections changed
+        this.socket.on('dashboard_update', (update) => {
+            if (update.connection) {
+                this.connectionStats = update.connection;
+                this.updateConnectionStatus();
+            }
+            if (update.performance) {
+                this.performanceData = update.performance;
+                this.updatePerformanceStats();
+                this.updateCharts();
+            }
+            if (update.signal) {
+                this.handleNewSignal(update.signal);
+            }
         });
 
         // Socket connection events
@@ -239,7 +249,7 @@ class PocketOptionDashboard {
     }
 
     updatePerformanceStats() {
-        const { total_signals, winning_signals, losing_signals, total_profit, active_assets } = this.performanceData;
+        const { total_signals, winning_signals, losing_signals, total_profit, active_assets_count } = this.performanceData;
         
         const totalSignalsEl = document.getElementById('total-signals');
         const winningSignalsEl = document.getElementById('winning-signals');
@@ -252,7 +262,7 @@ class PocketOptionDashboard {
         if (winningSignalsEl) winningSignalsEl.textContent = winning_signals;
         if (losingSignalsEl) losingSignalsEl.textContent = losing_signals;
         if (totalProfitEl) totalProfitEl.textContent = `$${total_profit.toFixed(2)}`;
-        if (activeAssetsEl) activeAssetsEl.textContent = active_assets || 0;
+        if (activeAssetsEl) activeAssetsEl.textContent = active_assets_count || 0;
         
         if (winRateEl) {
             const winRate = total_signals > 0 ? 
@@ -287,6 +297,11 @@ class PocketOptionDashboard {
         }
     }
 
+    handleNewSignal(signal) {
+        this.addSignalToUI(signal);
+        this.showNotification(`New ${signal.direction} signal for ${signal.asset}`);
+    }
+
     addSignalToUI(signal) {
         const signalsContainer = document.getElementById('signals-container');
         if (!signalsContainer) return;
@@ -18,6 +18,9 @@ def calculate_stochastic(high, low, close, k_period=14, d_period=3):
     return stoch_k, stoch_d
 
 class TrendFollowingStrategy:
+    # Fewest candles analyze() needs before it can emit anything but 'hold'
+    min_required_bars = 20
+    
     def __init__(self, timeframe='1m'):
         self.timeframe = timeframe
         self.name = f"TrendFollowing_{timeframe}"
@@ -53,7 +56,7 @@ class TrendFollowingStrategy:
     
     def analyze(self, data: pd.DataFrame) -> Dict[str, Any]:
         """Trend Following Strategy Analysis"""
-        if len(data) < 20:
+        if len(data) < self.min_required_bars:
             return {'signal': 'hold', 'confidence': 0}
         
         df = self.calculate_indicators(data)
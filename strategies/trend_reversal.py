@@ -31,6 +31,9 @@ except ImportError:
         return tr.rolling(window=period).mean()
 
 class TrendReversalStrategy:
+    # Fewest candles analyze() needs before it can emit anything but 'hold'
+    min_required_bars = 20
+    
     def __init__(self, timeframe='5m'):
         self.timeframe = timeframe
         self.name = f"TrendReversal_{timeframe}"
@@ -136,7 +139,7 @@ class TrendReversalStrategy:
     
     def analyze(self, data: pd.DataFrame) -> Dict[str, Any]:
         """Analyze data and generate signals"""
-        if len(data) < 20:
+        if len(data) < self.min_required_bars:
             return {'signal': 'hold', 'confidence': 0}
         
         df = self.calculate_indicators(data)